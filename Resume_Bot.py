@@ -1,22 +1,29 @@
 # Standard library imports
 import asyncio
-import io
+import atexit
 import os
 import json
+import queue
 import signal
 import time
 import logging
-from datetime import datetime
-from threading import Thread
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file
 
 # Third-party imports
 import psycopg2
+from fpdf import FPDF
 from telegram import (
     Update,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    InputFile,
     BotCommand,
     MenuButtonCommands,
     ReplyKeyboardRemove  # Moved here from telegram.ext
@@ -30,7 +37,7 @@ from telegram.ext import (
     filters,
     CallbackQueryHandler,
 )
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 
 # Local application imports
 from premium_security import (
@@ -60,17 +67,24 @@ async def run_webserver():
     await runner.setup()
     site = web.TCPSite(runner, '0.0.0.0', int(os.environ.get('PORT', 8080)))
     await site.start()
-    print("Web server started")
+    logger.info("Web server started")
+    return runner
     
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+# Configure logging: records are queued and written to the console by a
+# listener thread, so handlers never block on the stream
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+_log_handler = QueueHandler(_log_queue)
+_log_handler.setFormatter(logging.Formatter('%(message)s'))  # Full format applied by _log_stream
+logging.basicConfig(level=logging.INFO, handlers=[_log_handler])
 logger = logging.getLogger(__name__)
 
-# Global dictionary to store user data during the conversation
-user_data = {}
 redeem_attempts = {}
 
 # Define states for conversation
@@ -84,6 +98,73 @@ TEMPLATES = {
     "MINIMALIST": "✂️ Minimalist (Premium)",
 }
 
+# Detailed example data for full one-page resume previews
+EXAMPLE_DATA = {
+    "name": "Emily Chen",
+    "contact": "emily.chen@email.com | (555) 123-4567 | linkedin.com/in/emilychen | github.com/emilychen",
+    "education": (
+        "MSc in Computer Science, Stanford University\n"
+        "2018-2020 | GPA: 3.9/4.0\n"
+        "Specialization: Artificial Intelligence\n\n"
+        "BSc in Software Engineering, University of Toronto\n"
+        "2014-2018 | Graduated with Honors"
+    ),
+    "experience": (
+        "Senior Software Engineer, Tech Solutions Inc.\n"
+        "2020-Present | San Francisco, CA\n"
+        "- Lead team of 5 developers building scalable web applications\n"
+        "- Designed architecture for customer portal serving 1M+ users\n"
+        "- Reduced API response time by 40% through optimization\n\n"
+        "Software Developer Intern, DataSystems Corp\n"
+        "Summer 2019 | Mountain View, CA\n"
+        "- Developed machine learning pipeline for data classification\n"
+        "- Created automated testing framework saving 20+ hours/week"
+    ),
+    "skills": (
+        "Programming: Python, JavaScript, Java, C++, SQL\n"
+        "Frameworks: Django, React, TensorFlow, PyTorch\n"
+        "Tools: Git, Docker, AWS, Kubernetes, Jenkins\n"
+        "Languages: English (Fluent), Mandarin (Native)"
+    ),
+    "summary": (
+        "Results-driven software engineer with 5+ years of experience in full-stack development "
+        "and machine learning. Proven track record of designing and implementing scalable systems "
+        "that handle millions of users. Strong leadership skills with experience mentoring junior "
+        "developers. Passionate about creating efficient, maintainable code and solving complex "
+        "technical challenges."
+    ),
+    "user_id": None,
+}
+
+# Static menus, built once and shared by every handler that sends them
+_START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✨ Create New Resume", callback_data="new_resume")],
+    [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
+    [InlineKeyboardButton("ℹ️ Help", callback_data="show_help")],
+    [InlineKeyboardButton("🔒 Privacy Policy", callback_data="privacy_policy")],
+])
+_BACK_TO_MAIN_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
+])
+_PREMIUM_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🛒 Get Premium", callback_data="get_premium")],
+    [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
+])
+_GET_PREMIUM_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
+    [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
+])
+_REDEEM_SUCCESS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
+    [InlineKeyboardButton("✨ Create Resume", callback_data="new_resume")],
+])
+_TEMPLATE_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📄 Basic", callback_data="template_BASIC")],
+    [InlineKeyboardButton("💎 Modern", callback_data="template_MODERN")],
+    [InlineKeyboardButton("🎨 Creative", callback_data="template_CREATIVE")],
+    [InlineKeyboardButton("✂️ Minimalist", callback_data="template_MINIMALIST")],
+])
+
 # Fetch environment variables
 TOKEN = os.getenv("TOKEN")
 ADMIN_ID = os.getenv("ADMIN_ID")
@@ -96,33 +177,28 @@ if not ADMIN_ID:
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is missing.")
 
+# Telegram user ids are ints; compare against this instead of str(user.id)
+ADMIN_USER_ID = int(ADMIN_ID)
+
 async def db_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Admin-only guard
-    if str(update.effective_user.id) != ADMIN_ID:
+    if update.effective_user.id != ADMIN_USER_ID:
         await update.message.reply_text("❌ You’re not allowed to use this command.")
         return
 
     # Existing logic
-    conn = None
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1")
-            result = cur.fetchone()
-            if result and result[0] == 1:
-                await update.message.reply_text("✅ Database connection is healthy")
-            else:
-                await update.message.reply_text("⚠️ Database connection test failed")
+        if await run_db(ping_db):
+            await update.message.reply_text("✅ Database connection is healthy")
+        else:
+            await update.message.reply_text("⚠️ Database connection test failed")
     except Exception as e:
         await update.message.reply_text(f"❌ Database error: {e}")
-    finally:
-        if conn:
-            put_db_connection(conn)
 
 
 async def check_state(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Admin-only guard
-    if str(update.effective_user.id) != ADMIN_ID:
+    if update.effective_user.id != ADMIN_USER_ID:
         # use callback_query if coming from a button
         if update.callback_query:
             await update.callback_query.answer("❌ You’re not allowed to use this command.", show_alert=True)
@@ -130,9 +206,8 @@ async def check_state(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ You’re not allowed to use this command.")
         return
 
-    user_id = update.effective_user.id
     state = context.user_data.get('_conversation_state')
-    current_data = user_data.get(user_id, {})
+    current_data = context.user_data.get("resume", {})
 
     message = (
         f"🔄 Current State: {state}\n"
@@ -146,71 +221,281 @@ async def check_state(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 
-# Initialize connection pool
-connection_pool = SimpleConnectionPool(
-    minconn=1,
+# Initialize connection pool (thread-safe, shared by every DB call)
+connection_pool = ThreadedConnectionPool(
+    minconn=2,
     maxconn=10,
     dsn=DATABASE_URL,
     sslmode='require'
 )
 
 
+@contextmanager
 def get_db_connection():
-    return connection_pool.getconn()
+    """Borrow a pooled connection and always hand it back"""
+    conn = connection_pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        # Don't return a connection stuck in a failed transaction
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        connection_pool.putconn(conn)
 
-def put_db_connection(conn):
-    connection_pool.putconn(conn)
 
-def init_db():
-    command = """
+# Blocking DB calls run here instead of on the event loop. Together with
+# the PDF workers this stays within the pool's maxconn.
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix="db")
+
+
+async def run_db(func, *args):
+    """Run a blocking DB helper on the DB thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, func, *args)
+
+
+def ping_db():
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1")
+        result = cur.fetchone()
+    return bool(result and result[0] == 1)
+
+# Schema statements, sent to the server together in one round-trip
+SCHEMA_COMMANDS = (
+    """
     CREATE TABLE IF NOT EXISTS premium_data (
         id SERIAL PRIMARY KEY,
         value TEXT UNIQUE NOT NULL,
         expiry_date DATE NOT NULL,
         is_key BOOLEAN NOT NULL
-    );
+    )
+    """,
+    # Covers is_premium() and the premium id snapshot with index-only scans
     """
-    conn = None
+    CREATE INDEX IF NOT EXISTS premium_users_idx
+    ON premium_data (value, expiry_date) WHERE is_key = FALSE
+    """,
+)
+
+
+def init_db():
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(command)
+        with get_db_connection() as conn, conn.cursor() as cur:
+            cur.execute(";".join(SCHEMA_COMMANDS))
             conn.commit()
     except Exception as e:
         logger.error(f"DB Init Error: {e}")
         raise
-    finally:
-        if conn:
-            put_db_connection(conn)
 
 
 init_db()
 
+# is_premium() results: int user id -> (checked_at, is_premium), oldest first
+_premium_cache = OrderedDict()
+_premium_cache_lock = Lock()
+_PREMIUM_TTL = 300  # seconds
+_PREMIUM_CACHE_SIZE = 10_000
+
+
+# Int ids of all currently-premium users, reloaded every _PREMIUM_TTL so that
+# is_premium() can answer "no" for everyone else without a query
+_premium_ids = None
+_premium_ids_loaded_at = 0.0
+_premium_ids_lock = Lock()
+
+
+def invalidate_premium(user_id):
+    with _premium_cache_lock:
+        _premium_cache.pop(int(user_id), None)
+
+
+def premium_user_ids():
+    """Return the premium id snapshot, or None if it couldn't be loaded"""
+    global _premium_ids, _premium_ids_loaded_at
+    with _premium_ids_lock:
+        if time.time() - _premium_ids_loaded_at >= _PREMIUM_TTL:
+            try:
+                with get_db_connection() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT value FROM premium_data "
+                        "WHERE is_key = FALSE AND expiry_date > CURRENT_DATE"
+                    )
+                    _premium_ids = {
+                        int(value) for (value,) in cur.fetchall() if value.isdigit()
+                    }
+            except Exception as e:
+                logger.error(f"DB Premium Snapshot Error: {e}")
+                _premium_ids = None  # Fall back to per-user queries
+            _premium_ids_loaded_at = time.time()
+        return _premium_ids
+
+
+def cached_premium(user_id):
+    """Answer is_premium() from memory, or return None if the DB is needed"""
+    with _premium_cache_lock:
+        entry = _premium_cache.get(user_id)
+        if entry and time.time() - entry[0] < _PREMIUM_TTL:
+            _premium_cache.move_to_end(user_id)
+            return entry[1]
+
+    premium_ids = _premium_ids
+    if (premium_ids is not None
+            and time.time() - _premium_ids_loaded_at < _PREMIUM_TTL
+            and user_id not in premium_ids):
+        return False
+    return None
+
 
 def is_premium(user_id):
     if not user_id:
         return False
 
-    conn = get_db_connection()
+    cached = cached_premium(user_id)
+    if cached is not None:
+        return cached
+
+    premium_ids = premium_user_ids()
+    if premium_ids is not None and user_id not in premium_ids:
+        return False
+
     try:
-        with conn.cursor() as cur:
+        with get_db_connection() as conn, conn.cursor() as cur:
             cur.execute(
-                "SELECT expiry_date FROM premium_data WHERE value = %s AND is_key = FALSE",
+                "SELECT expiry_date > CURRENT_DATE FROM premium_data "
+                "WHERE value = %s AND is_key = FALSE",
                 (str(user_id),)
             )
             row = cur.fetchone()
-            if row:
-                expiry_date = row[0]
-                return expiry_date > datetime.now().date()
-            return False
+        result = bool(row and row[0])
     except Exception as e:
         logger.error(f"DB Premium Check Error: {e}")
-        return False
-    finally:
-        if conn:
-            put_db_connection(conn)
+        notify_admin(f"🚨 DB Premium Check Error: {e}")
+        return False  # Not cached, so the next call retries the DB
+
+    with _premium_cache_lock:
+        _premium_cache[user_id] = (time.time(), result)
+        _premium_cache.move_to_end(user_id)
+        if len(_premium_cache) > _PREMIUM_CACHE_SIZE:
+            _premium_cache.popitem(last=False)
+    return result
+
+
+async def check_premium(user_id):
+    """is_premium() for async handlers; only cache misses touch a DB thread"""
+    if user_id:
+        cached = cached_premium(user_id)
+        if cached is not None:
+            return cached
+    return await run_db(is_premium, user_id)
+
+
+def get_key_expiry(key):
+    """Return an unredeemed key's expiry date, or None if it doesn't exist"""
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT expiry_date FROM premium_data WHERE value = %s AND is_key = TRUE",
+            (key,)
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def add_premium_key(key, expiry):
+    """Store a newly generated premium key"""
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO premium_data (value, expiry_date, is_key) VALUES (%s, %s, TRUE)",
+            (key, expiry)
+        )
+        conn.commit()
+
+
+def redeem_premium_key(user_id, key):
+    """Consume a premium key and grant its expiry to user_id in one statement.
+
+    Returns the granted expiry date, or None if the key is unknown, expired,
+    or was just redeemed by someone else.
+    """
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            WITH consumed AS (
+                DELETE FROM premium_data
+                WHERE value = %s AND is_key = TRUE AND expiry_date >= CURRENT_DATE
+                RETURNING expiry_date
+            ), granted AS (
+                INSERT INTO premium_data (value, expiry_date, is_key)
+                SELECT %s, expiry_date, FALSE FROM consumed
+                ON CONFLICT (value) DO UPDATE SET expiry_date = EXCLUDED.expiry_date
+                -- Skip rewriting the user row when the expiry is unchanged
+                WHERE premium_data.expiry_date IS DISTINCT FROM EXCLUDED.expiry_date
+            )
+            SELECT expiry_date FROM consumed
+            """,
+            (key, str(user_id))
+        )
+        row = cur.fetchone()
+        conn.commit()
+
+    invalidate_premium(user_id)
+    if row:
+        with _premium_ids_lock:
+            if _premium_ids is not None:
+                _premium_ids.add(int(user_id))
+    return row[0] if row else None
+
+# Admin alerts are queued and sent in the background, so sync code
+# (DB helpers, worker threads) never waits on the Telegram API. Both are
+# set in post_init so the queue belongs to the loop the bot runs on.
+_admin_alerts = None
+_alert_loop = None
+
+# Token bucket for admin alerts: bursts of _ALERT_BURST, then one per
+# _ALERT_REFILL seconds. Everything is logged anyway, so extras are dropped.
+_ALERT_BURST = 5
+_ALERT_REFILL = 12  # seconds per token
+
+
+def notify_admin(text):
+    """Queue a message for the admin; safe to call from any thread"""
+    if _alert_loop is None:
+        logger.warning(f"Admin alert dropped (bot not started): {text}")
+        return
+    _alert_loop.call_soon_threadsafe(_admin_alerts.put_nowait, text)
+
+
+async def admin_alert_worker(application):
+    """Deliver queued admin alerts, rate-limited so error bursts don't flood"""
+    tokens = _ALERT_BURST
+    refilled_at = time.monotonic()
+    suppressed = 0
+    while True:
+        text = await _admin_alerts.get()
+
+        now = time.monotonic()
+        tokens = min(_ALERT_BURST, tokens + (now - refilled_at) / _ALERT_REFILL)
+        refilled_at = now
+        if tokens < 1:
+            suppressed += 1
+            continue
+        tokens -= 1
+        if suppressed:
+            text += f"\n\n({suppressed} more alerts suppressed, see logs)"
+            suppressed = 0
+
+        try:
+            await application.bot.send_message(chat_id=ADMIN_ID, text=text)
+        except Exception as e:
+            logger.error(f"Admin alert delivery failed: {e}")
+
 
 async def post_init(application):
+    global _admin_alerts, _alert_loop
+    _admin_alerts = asyncio.Queue()
+    _alert_loop = asyncio.get_running_loop()
+    asyncio.create_task(admin_alert_worker(application))
+
     commands = [
         BotCommand("start", "Start the bot"),
         BotCommand("newresume", "Create a new resume"),
@@ -222,19 +507,13 @@ async def post_init(application):
     ]
     await application.bot.set_my_commands(commands)
     await application.bot.set_chat_menu_button(menu_button=MenuButtonCommands())
-    asyncio.create_task(security_monitor(application))
+    asyncio.create_task(run_repeating(security_monitor, application, interval=300, first=60))
+    asyncio.create_task(run_repeating(sweep_resume_drafts, application, interval=60, first=60))
     
     commands = await application.bot.get_my_commands()
     logger.info(f"Bot commands registered: {commands}")
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    keyboard = [
-        [InlineKeyboardButton("✨ Create New Resume", callback_data="new_resume")],
-        [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
-        [InlineKeyboardButton("ℹ️ Help", callback_data="show_help")],
-        [InlineKeyboardButton("🔒 Privacy Policy", callback_data="privacy_policy")],  # New button
-    ]
-
     user = update.effective_user
     greeting = (
         f"🌟 *Welcome to ResumeGenie*, {user.first_name}!\n\n"
@@ -244,14 +523,14 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     premium_status = (
         "🌟 *Premium Status:* Active"
-        if is_premium(user.id)
+        if await check_premium(user.id)
         else "🔒 *Premium Status:* Not Active"
     )
 
     if update.message:
         await update.message.reply_text(
             f"{greeting}\n\n{premium_status}",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_START_KEYBOARD,
             parse_mode="Markdown",
         )
     else:
@@ -259,7 +538,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.answer()
         await query.edit_message_text(
             f"{greeting}\n\n{premium_status}",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_START_KEYBOARD,
             parse_mode="Markdown",
         )
 
@@ -288,11 +567,12 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await handlers[query.data](update, context)
     elif query.data.startswith("template_"):
         template = query.data.split("_")[1]
-        user_id = query.from_user.id
-        if user_id not in user_data:
-            user_data[user_id] = {}
-        user_data[user_id]["template"] = template
-        user_data[user_id]["user_id"] = user_id
+        resume = get_draft(context)
+        if resume is None:
+            await query.edit_message_text(_DRAFT_EXPIRED_TEXT)
+            return
+        resume["template"] = template
+        resume["user_id"] = query.from_user.id
         await query.edit_message_text(
             f"✅ Selected template: *{TEMPLATES[template]}*", parse_mode="Markdown"
         )
@@ -326,27 +606,20 @@ async def show_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 Need more help? Contact @ThantLwinMaung
 """
-    keyboard = [[InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     if update.callback_query:
         await update.callback_query.answer()
         await update.callback_query.edit_message_text(help_text,
                                                      parse_mode="Markdown",
-                                                     reply_markup=reply_markup)
+                                                     reply_markup=_BACK_TO_MAIN_KB)
     else:
         await update.message.reply_text(help_text,
                                         parse_mode="Markdown",
-                                        reply_markup=reply_markup)
+                                        reply_markup=_BACK_TO_MAIN_KB)
 
 async def show_privacy_policy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     privacy_policy_url = "https://privacyforresumegenie.onrender.com"  # Replace with your actual URL
     
-    keyboard = [
-        [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
-    ]
-    
     message = (
         "🔒 *Privacy Policy*\n\n"
         "We take your privacy seriously. Please read our privacy policy at:\n"
@@ -360,25 +633,60 @@ async def show_privacy_policy(update: Update, context: ContextTypes.DEFAULT_TYPE
     if query:
         await query.edit_message_text(
             message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_BACK_TO_MAIN_KB,
             parse_mode="Markdown",
             disable_web_page_preview=True
         )
     else:
         await update.message.reply_text(
             message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_BACK_TO_MAIN_KB,
             parse_mode="Markdown",
             disable_web_page_preview=True
         )
-        
+
+
+# Limits for resume drafts, enforced by sweep_resume_drafts
+_DRAFT_IDLE_TIMEOUT = 1800  # seconds
+_MAX_DRAFTS = 10_000
+
+
+_DRAFT_EXPIRED_TEXT = "⌛ Your session expired. Send /newresume to start again."
+
+
+def get_draft(context):
+    """Return the user's resume draft marked as recently used, or None if it was swept"""
+    draft = context.user_data.get("resume")
+    if draft is not None:
+        draft["last_touch"] = time.time()
+    return draft
+
+
+async def sweep_resume_drafts(application):
+    """Drop abandoned drafts, oldest first beyond _MAX_DRAFTS (one pass)"""
+    try:
+        drafts = sorted(
+            (data["resume"].get("last_touch", 0), user_id)
+            for user_id, data in application.user_data.items()
+            if "resume" in data
+        )
+        cutoff = time.time() - _DRAFT_IDLE_TIMEOUT
+        excess = len(drafts) - _MAX_DRAFTS
+        for i, (last_touch, user_id) in enumerate(drafts):
+            if i >= excess and last_touch > cutoff:
+                break
+            application.user_data[user_id].pop("resume", None)
+    except Exception as e:
+        logger.error(f"Draft sweep error: {e}")
+
+
 async def new_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         query = update.callback_query if update.callback_query else None
         user_id = update.effective_user.id
 
-        # Initialize user data
-        user_data[user_id] = {
+        # Initialize the resume draft (kept in PTB's per-user storage)
+        context.user_data["resume"] = {
             "name": "",
             "contact": "",
             "education": "",
@@ -387,6 +695,7 @@ async def new_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "summary": "",
             "template": "BASIC",
             "user_id": user_id,
+            "last_touch": time.time(),
         }
 
         message = (
@@ -423,7 +732,11 @@ async def new_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def get_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user_id = update.effective_user.id
-        user_data[user_id]["name"] = update.message.text
+        draft = get_draft(context)
+        if draft is None:
+            await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+            return ConversationHandler.END
+        draft["name"] = update.message.text
         logger.info(f"User {user_id} provided name: {update.message.text}")
 
         await update.message.reply_text(
@@ -443,8 +756,11 @@ async def get_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def get_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    user_data[user_id]["contact"] = update.message.text
+    draft = get_draft(context)
+    if draft is None:
+        await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+        return ConversationHandler.END
+    draft["contact"] = update.message.text
 
     await update.message.reply_text(
         "🎓 *Step 3 of 7*\n"
@@ -459,8 +775,11 @@ async def get_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def get_education(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    user_data[user_id]["education"] = update.message.text
+    draft = get_draft(context)
+    if draft is None:
+        await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+        return ConversationHandler.END
+    draft["education"] = update.message.text
 
     await update.message.reply_text(
         "💼 *Step 4 of 7*\n"
@@ -475,8 +794,11 @@ async def get_education(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def get_experience(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    user_data[user_id]["experience"] = update.message.text
+    draft = get_draft(context)
+    if draft is None:
+        await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+        return ConversationHandler.END
+    draft["experience"] = update.message.text
 
     await update.message.reply_text(
         "🛠️ *Step 5 of 7*\n"
@@ -489,8 +811,11 @@ async def get_experience(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def get_skills(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    user_data[user_id]["skills"] = update.message.text
+    draft = get_draft(context)
+    if draft is None:
+        await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+        return ConversationHandler.END
+    draft["skills"] = update.message.text
 
     await update.message.reply_text(
         "📝 *Step 6 of 7*\n"
@@ -506,67 +831,29 @@ async def get_skills(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def get_summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user_data[user_id]["summary"] = update.message.text
-
-    if is_premium(user_id):
-        # Detailed example data for full one-page resume previews
-        example_data = {
-            "name": "Emily Chen",
-            "contact": "emily.chen@email.com | (555) 123-4567 | linkedin.com/in/emilychen | github.com/emilychen",
-            "education": (
-                "MSc in Computer Science, Stanford University\n"
-                "2018-2020 | GPA: 3.9/4.0\n"
-                "Specialization: Artificial Intelligence\n\n"
-                "BSc in Software Engineering, University of Toronto\n"
-                "2014-2018 | Graduated with Honors"
-            ),
-            "experience": (
-                "Senior Software Engineer, Tech Solutions Inc.\n"
-                "2020-Present | San Francisco, CA\n"
-                "- Lead team of 5 developers building scalable web applications\n"
-                "- Designed architecture for customer portal serving 1M+ users\n"
-                "- Reduced API response time by 40% through optimization\n\n"
-                "Software Developer Intern, DataSystems Corp\n"
-                "Summer 2019 | Mountain View, CA\n"
-                "- Developed machine learning pipeline for data classification\n"
-                "- Created automated testing framework saving 20+ hours/week"
-            ),
-            "skills": (
-                "Programming: Python, JavaScript, Java, C++, SQL\n"
-                "Frameworks: Django, React, TensorFlow, PyTorch\n"
-                "Tools: Git, Docker, AWS, Kubernetes, Jenkins\n"
-                "Languages: English (Fluent), Mandarin (Native)"
-            ),
-            "summary": (
-                "Results-driven software engineer with 5+ years of experience in full-stack development "
-                "and machine learning. Proven track record of designing and implementing scalable systems "
-                "that handle millions of users. Strong leadership skills with experience mentoring junior "
-                "developers. Passionate about creating efficient, maintainable code and solving complex "
-                "technical challenges."
-            ),
-            "user_id": user_id,
-        }
-
-        # Create template selection
-        keyboard = [
-            [InlineKeyboardButton("📄 Basic", callback_data="template_BASIC")],
-            [InlineKeyboardButton("💎 Modern", callback_data="template_MODERN")],
-            [InlineKeyboardButton("🎨 Creative", callback_data="template_CREATIVE")],
-            [InlineKeyboardButton("✂️ Minimalist", callback_data="template_MINIMALIST")],
-        ]
-
-        # Generate and send previews
-        for template in TEMPLATES.keys():
-            try:
-                pdf_bytes = generate_pdf_bytes({**example_data, "template": template})
-                await context.bot.send_document(
+    draft = get_draft(context)
+    if draft is None:
+        await update.message.reply_text(_DRAFT_EXPIRED_TEXT)
+        return ConversationHandler.END
+    draft["summary"] = update.message.text
+
+    if await check_premium(user_id):
+        # Send the pre-rendered previews concurrently
+        templates = list(TEMPLATES)
+        results = await asyncio.gather(
+            *(
+                context.bot.send_document(
                     chat_id=update.effective_chat.id,
-                    document=io.BytesIO(pdf_bytes),
-                    filename=f"{template}_preview.pdf",
+                    document=_PREVIEW_FILES[template],
                     caption=f"Preview: {TEMPLATES[template]}",
                 )
-            except Exception as e:
-                print(f"Error generating {template} preview: {e}")
+                for template in templates
+            ),
+            return_exceptions=True,
+        )
+        for template, result in zip(templates, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error sending {template} preview: {result}")
                 await update.message.reply_text(
                     f"Couldn't generate {template} preview. Please try another template."
                 )
@@ -576,11 +863,11 @@ async def get_summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "Above you'll see previews of each template with example data.\n"
             "Select which one you'd like to use for your resume:",
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_TEMPLATE_KEYBOARD,
         )
         return ConversationHandler.END
     else:
-        user_data[user_id]["template"] = "BASIC"
+        draft["template"] = "BASIC"
         await update.message.reply_text(
             "⏳ Generating your resume with *Basic template*...\n\n"
             "Upgrade to premium for stylish templates!",
@@ -594,185 +881,200 @@ async def generate_resume(update: Update, context: ContextTypes.DEFAULT_TYPE):
         query = update.callback_query
         await query.answer()
         message = query.message
-        user_id = query.from_user.id
     else:
         message = update.message
-        user_id = update.effective_user.id
 
     # Ensure we have complete data
-    if user_id not in user_data:
-        await message.reply_text("❌ Error: Resume data not found. Please start again.")
+    resume = context.user_data.get("resume")
+    if resume is None:
+        await message.reply_text(_DRAFT_EXPIRED_TEXT)
         return ConversationHandler.END
 
-    # Generate PDF
+    # Generate PDF off the event loop so other users aren't blocked; the
+    # premium check happens here so the PDF threads never touch the DB
     try:
-        pdf_bytes = generate_pdf_bytes(user_data[user_id])
+        is_premium_user = await check_premium(resume.get("user_id"))
+        pdf_bytes = await asyncio.get_running_loop().run_in_executor(
+            _PDF_EXECUTOR,
+            partial(generate_pdf_bytes, resume, is_premium_user=is_premium_user),
+        )
     except Exception as e:
         await message.reply_text("❌ Error generating resume. Please try again.")
         return ConversationHandler.END
 
     # Send to user
     await message.reply_document(
-        document=io.BytesIO(pdf_bytes),
-        filename=f"{user_data[user_id]['name']}_Resume.pdf",
+        document=pdf_bytes,
+        filename=f"{resume['name']}_Resume.pdf",
         caption="✅ *Your professional resume is ready!*",
         parse_mode="Markdown",
     )
 
     # Clear user data after sending
-    if user_id in user_data:
-        del user_data[user_id]
+    context.user_data.pop("resume", None)
 
     return ConversationHandler.END
 
 
-def generate_pdf_bytes(data, preview_mode=False):
+class PDF(FPDF):
+    def header(self):
+        pass
 
-    from fpdf import FPDF
+    def footer(self):
+        pass
 
-    class PDF(FPDF):
-        def header(self):
-            pass
 
-        def footer(self):
-            pass
+# Resume sections in print order, and each template's heading for them
+_SECTION_KEYS = ("summary", "education", "experience", "skills")
+_BASIC_TITLES = ("PROFESSIONAL SUMMARY", "EDUCATION", "WORK EXPERIENCE", "SKILLS")
+_MODERN_TITLES = ("  SUMMARY", "  EDUCATION", "  EXPERIENCE", "  SKILLS")
+_CREATIVE_TITLES = ("  About Me", "  Learning Journey", "  Career Path", "  Core Skills")
+_MINIMALIST_TITLES = ("  Summary", "  Education", "  Experience", "  Skills")
 
-    pdf = PDF()
-    pdf.add_page()
 
-    template = data.get("template", "BASIC")
-    user_id = data.get("user_id")
+def _render_basic(pdf, data, contact_line):
+    pdf.set_font("Arial", "B", 20)
+    pdf.set_text_color(50, 50, 50)
+    pdf.cell(0, 14, data["name"], 0, 1, "C")
 
-    if template != "BASIC" and not preview_mode and not is_premium(user_id):
-        template = "BASIC"
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(0, 8, contact_line, 0, 1, "C")
 
-    if template == "BASIC":
-        pdf.set_font("Arial", "B", 20)
-        pdf.set_text_color(50, 50, 50)
-        pdf.cell(0, 14, data["name"], 0, 1, "C")
+    pdf.set_draw_color(160, 160, 160)
+    pdf.set_line_width(0.4)
+    pdf.line(15, pdf.get_y() + 4, 195, pdf.get_y() + 4)
+    pdf.ln(12)
 
+    for title, key in zip(_BASIC_TITLES, _SECTION_KEYS):
+        pdf.set_font("Arial", "B", 14)
+        pdf.set_text_color(70, 70, 70)
+        pdf.cell(0, 8, title, 0, 1)
+        pdf.set_draw_color(200, 200, 200)
+        pdf.line(15, pdf.get_y() + 1, 195, pdf.get_y() + 1)
+        pdf.ln(5)
+        pdf.set_font("Arial", "", 11)
+        pdf.set_text_color(30, 30, 30)
+        pdf.multi_cell(0, 7, data[key])
+        pdf.ln(8)
+
+
+def _render_modern(pdf, data, contact_line):
+    pdf.set_fill_color(0, 102, 204)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", "B", 22)
+    pdf.cell(0, 14, data["name"], 0, 1, "C", True)
+
+    pdf.set_font("Arial", "", 10)
+    pdf.set_text_color(50, 50, 50)
+    pdf.ln(5)
+    pdf.cell(0, 8, contact_line, 0, 1, "C")
+    pdf.ln(5)
+
+    for title, key in zip(_MODERN_TITLES, _SECTION_KEYS):
+        pdf.set_font("Arial", "B", 12)
+        pdf.set_fill_color(230, 240, 255)
+        pdf.set_text_color(0, 102, 204)
+        pdf.cell(0, 8, title, 0, 1, "L", True)
         pdf.set_font("Arial", "", 10)
-        contact_parts = [part.strip() for part in data["contact"].split("|")]
-        contact_line = " | ".join(contact_parts)
-        pdf.cell(0, 8, contact_line, 0, 1, "C")
-
-        pdf.set_draw_color(160, 160, 160)
-        pdf.set_line_width(0.4)
-        pdf.line(15, pdf.get_y() + 4, 195, pdf.get_y() + 4)
-        pdf.ln(12)
-
-        sections = [
-            ("PROFESSIONAL SUMMARY", data["summary"]),
-            ("EDUCATION", data["education"]),
-            ("WORK EXPERIENCE", data["experience"]),
-            ("SKILLS", data["skills"]),
-        ]
+        pdf.set_text_color(30, 30, 30)
+        pdf.multi_cell(0, 6, data[key])
+        pdf.ln(5)
 
-        for title, content in sections:
-            pdf.set_font("Arial", "B", 14)
-            pdf.set_text_color(70, 70, 70)
-            pdf.cell(0, 8, title, 0, 1)
-            pdf.set_draw_color(200, 200, 200)
-            pdf.line(15, pdf.get_y() + 1, 195, pdf.get_y() + 1)
-            pdf.ln(5)
-            pdf.set_font("Arial", "", 11)
-            pdf.set_text_color(30, 30, 30)
-            pdf.multi_cell(0, 7, content)
-            pdf.ln(8)
-
-    elif template == "MODERN":
-        pdf.set_fill_color(0, 102, 204)
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font("Arial", "B", 22)
-        pdf.cell(0, 14, data["name"], 0, 1, "C", True)
 
+def _render_creative(pdf, data, contact_line):
+    pdf.set_font("Arial", "B", 20)
+    pdf.set_text_color(153, 0, 76)
+    pdf.cell(0, 14, data["name"], 0, 1, "C")
+
+    pdf.set_font("Arial", "I", 10)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 8, contact_line, 0, 1, "C")
+    pdf.ln(5)
+
+    for title, key in zip(_CREATIVE_TITLES, _SECTION_KEYS):
+        pdf.set_font("Arial", "B", 13)
+        pdf.set_fill_color(255, 230, 240)
+        pdf.set_text_color(204, 0, 102)
+        pdf.cell(0, 8, title, 0, 1, "L", True)
         pdf.set_font("Arial", "", 10)
-        pdf.set_text_color(50, 50, 50)
-        pdf.ln(5)
-        contact_line = " | ".join([part.strip() for part in data["contact"].split("|")])
-        pdf.cell(0, 8, contact_line, 0, 1, "C")
+        pdf.set_text_color(40, 40, 40)
+        pdf.multi_cell(0, 6, data[key])
         pdf.ln(5)
 
-        sections = [
-            ("Summary", data["summary"]),
-            ("Education", data["education"]),
-            ("Experience", data["experience"]),
-            ("Skills", data["skills"]),
-        ]
 
-        for title, content in sections:
-            pdf.set_font("Arial", "B", 12)
-            pdf.set_fill_color(230, 240, 255)
-            pdf.set_text_color(0, 102, 204)
-            pdf.cell(0, 8, f"  {title.upper()}", 0, 1, "L", True)
-            pdf.set_font("Arial", "", 10)
-            pdf.set_text_color(30, 30, 30)
-            pdf.multi_cell(0, 6, content)
-            pdf.ln(5)
-
-    elif template == "CREATIVE":
-        pdf.set_font("Arial", "B", 20)
-        pdf.set_text_color(153, 0, 76)
-        pdf.cell(0, 14, data["name"], 0, 1, "C")
-
-        pdf.set_font("Arial", "I", 10)
-        pdf.set_text_color(100, 100, 100)
-        contact_line = " | ".join([part.strip() for part in data["contact"].split("|")])
-        pdf.cell(0, 8, contact_line, 0, 1, "C")
-        pdf.ln(5)
+def _render_minimalist(pdf, data, contact_line):
+    pdf.set_font("Arial", "B", 18)
+    pdf.set_text_color(30, 30, 30)
+    pdf.cell(0, 12, data["name"], 0, 1, "C")
 
-        sections = [
-            ("About Me", data["summary"]),
-            ("Learning Journey", data["education"]),
-            ("Career Path", data["experience"]),
-            ("Core Skills", data["skills"]),
-        ]
+    pdf.set_font("Arial", "", 9)
+    pdf.set_text_color(80, 80, 80)
+    pdf.cell(0, 6, contact_line, 0, 1, "C")
+    pdf.ln(6)
 
-        for title, content in sections:
-            pdf.set_font("Arial", "B", 13)
-            pdf.set_fill_color(255, 230, 240)
-            pdf.set_text_color(204, 0, 102)
-            pdf.cell(0, 8, f"  {title}", 0, 1, "L", True)
-            pdf.set_font("Arial", "", 10)
-            pdf.set_text_color(40, 40, 40)
-            pdf.multi_cell(0, 6, content)
-            pdf.ln(5)
-
-    elif template == "MINIMALIST":
-        pdf.set_font("Arial", "B", 18)
-        pdf.set_text_color(30, 30, 30)
-        pdf.cell(0, 12, data["name"], 0, 1, "C")
-
-        pdf.set_font("Arial", "", 9)
-        pdf.set_text_color(80, 80, 80)
-        contact_line = " | ".join([part.strip() for part in data["contact"].split("|")])
-        pdf.cell(0, 6, contact_line, 0, 1, "C")
-        pdf.ln(6)
-
-        sections = [
-            ("Summary", data["summary"]),
-            ("Education", data["education"]),
-            ("Experience", data["experience"]),
-            ("Skills", data["skills"]),
-        ]
+    for title, key in zip(_MINIMALIST_TITLES, _SECTION_KEYS):
+        pdf.set_font("Arial", "B", 11)
+        pdf.set_fill_color(245, 245, 245)
+        pdf.set_text_color(60, 60, 60)
+        pdf.cell(0, 8, title, 0, 1, "L", True)
+        pdf.set_font("Arial", "", 10)
+        pdf.set_text_color(50, 50, 50)
+        pdf.multi_cell(0, 6, data[key])
+        pdf.ln(4)
+
+
+# Template name -> renderer for the resume body
+_RENDERERS = {
+    "BASIC": _render_basic,
+    "MODERN": _render_modern,
+    "CREATIVE": _render_creative,
+    "MINIMALIST": _render_minimalist,
+}
+
+
+def generate_pdf_bytes(data, preview_mode=False, is_premium_user=None):
+    pdf = PDF()
+    pdf.add_page()
+
+    template = data.get("template", "BASIC")
+    if is_premium_user is None:
+        is_premium_user = is_premium(data.get("user_id"))
+
+    if template != "BASIC" and not preview_mode and not is_premium_user:
+        template = "BASIC"
+
+    renderer = _RENDERERS.get(template)
+    if renderer:
+        contact_line = " | ".join(part.strip() for part in data["contact"].split("|"))
+        renderer(pdf, data, contact_line)
 
-        for title, content in sections:
-            pdf.set_font("Arial", "B", 11)
-            pdf.set_fill_color(245, 245, 245)
-            pdf.set_text_color(60, 60, 60)
-            pdf.cell(0, 8, f"  {title}", 0, 1, "L", True)
-            pdf.set_font("Arial", "", 10)
-            pdf.set_text_color(50, 50, 50)
-            pdf.multi_cell(0, 6, content)
-            pdf.ln(4)
-
-    if not is_premium(user_id):
+    if not is_premium_user:
         pdf.set_font("Arial", "I", 8)
         pdf.set_text_color(200, 200, 200)
         pdf.set_y(-10)
         pdf.cell(0, 10, "Created with ResumeGenie", 0, 0, "R")
 
-    return pdf.output(dest="S").encode("latin1")
+    output = pdf.output(dest="S")
+    # fpdf 1.7 hands back a latin-1 str; fpdf2 already returns a bytearray
+    if isinstance(output, str):
+        return output.encode("latin1")
+    return bytes(output)
+
+
+# fpdf rendering is CPU-bound, so handlers run it on worker threads
+_PDF_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf")
+
+# Example data never changes, so render every template preview once at startup
+# and wrap it once; the same InputFile is reused for every upload
+_PREVIEW_FILES = {
+    template: InputFile(
+        generate_pdf_bytes(
+            {**EXAMPLE_DATA, "template": template}, preview_mode=True, is_premium_user=False
+        ),
+        filename=f"{template}_preview.pdf",
+    )
+    for template in TEMPLATES
+}
 
 
 async def show_premium_features(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -805,59 +1107,15 @@ async def show_premium_features(update: Update, context: ContextTypes.DEFAULT_TY
 2. Get your premium key
 3. Use /redeem <key>
 """
-    keyboard = [
-        [InlineKeyboardButton("🛒 Get Premium", callback_data="get_premium")],
-        [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     if update.callback_query:
         await update.callback_query.answer()
         await update.callback_query.edit_message_text(premium_text,
                                                      parse_mode="Markdown",
-                                                     reply_markup=reply_markup)
+                                                     reply_markup=_PREMIUM_KEYBOARD)
     else:
         await update.message.reply_text(premium_text,
                                         parse_mode="Markdown",
-                                        reply_markup=reply_markup)
-
-    # Send example premium templates
-    example_data = {
-        "name": "Emily Chen",
-        "contact": "emily.chen@email.com | (555) 123-4567 | linkedin.com/in/emilychen",
-        "education": (
-            "MSc in Computer Science, Stanford University\n"
-            "2018-2020 | GPA: 3.9/4.0\n"
-            "Specialization: Artificial Intelligence\n\n"
-            "BSc in Software Engineering, University of Toronto\n"
-            "2014-2018 | Graduated with Honors"
-        ),
-        "experience": (
-            "Senior Software Engineer, Tech Solutions Inc.\n"
-            "2020-Present | San Francisco, CA\n"
-            "- Lead team of 5 developers building scalable web applications\n"
-            "- Designed architecture for customer portal serving 1M+ users\n"
-            "- Reduced API response time by 40% through optimization\n\n"
-            "Software Developer Intern, DataSystems Corp\n"
-            "Summer 2019 | Mountain View, CA\n"
-            "- Developed machine learning pipeline for data classification\n"
-            "- Created automated testing framework saving 20+ hours/week"
-        ),
-        "skills": (
-            "Programming: Python, JavaScript, Java, C++, SQL\n"
-            "Frameworks: Django, React, TensorFlow, PyTorch\n"
-            "Tools: Git, Docker, AWS, Kubernetes, Jenkins\n"
-            "Languages: English (Fluent), Mandarin (Native)"
-        ),
-        "summary": (
-            "Results-driven software engineer with 5+ years of experience in full-stack development "
-            "and machine learning. Proven track record of designing and implementing scalable systems "
-            "that handle millions of users. Strong leadership skills with experience mentoring junior "
-            "developers. Passionate about creating efficient, maintainable code and solving complex "
-            "technical challenges."
-        ),
-        "user_id": update.effective_user.id,
-    }
+                                        reply_markup=_PREMIUM_KEYBOARD)
 
     # Send loading message
     await context.bot.send_message(
@@ -866,20 +1124,23 @@ async def show_premium_features(update: Update, context: ContextTypes.DEFAULT_TY
         parse_mode="Markdown",
     )
 
-    # Generate and send previews of premium templates
-    for template in ["MODERN", "CREATIVE", "MINIMALIST"]:
-        try:
-            pdf_bytes = generate_pdf_bytes({**example_data, "template": template}, preview_mode=True)
-            await context.bot.send_document(
+    # Send the pre-rendered previews of premium templates concurrently
+    templates = ["MODERN", "CREATIVE", "MINIMALIST"]
+    results = await asyncio.gather(
+        *(
+            context.bot.send_document(
                 chat_id=update.effective_chat.id,
-                document=io.BytesIO(pdf_bytes),
-                filename=f"{template}_example.pdf",
+                document=_PREVIEW_FILES[template],
                 caption=f"Example: {TEMPLATES[template]}",
                 parse_mode="Markdown",
             )
-
-        except Exception as e:
-            print(f"Error generating {template} example: {e}")
+            for template in templates
+        ),
+        return_exceptions=True,
+    )
+    for template, result in zip(templates, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error sending {template} example: {result}")
             await context.bot.send_message(
                 chat_id=update.effective_chat.id,
                 text=f"⚠️ Couldn't generate {template} example. Please try again later.",
@@ -887,13 +1148,13 @@ async def show_premium_features(update: Update, context: ContextTypes.DEFAULT_TY
             )
 
     # Add reminder for non-premium users
-    if not is_premium(update.effective_user.id):
+    if not await check_premium(update.effective_user.id):
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text="🔓 *Upgrade to premium* to use these beautiful templates!\n\n"
             "Use /redeem with your premium key or contact @ThantLwinMaung to get started.",
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=_PREMIUM_KEYBOARD,
         )
 
 
@@ -901,23 +1162,18 @@ async def get_premium(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     contact_admin = "📩 Contact @ThantLwinMaung to get your premium key!"
 
-    keyboard = [
-        [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
-        [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")],
-    ]
-
     await query.edit_message_text(
         f"🌟 *Get Premium Access*\n\n{contact_admin}\n\n"
         "After receiving your premium key, use:\n"
         "`/redeem YOUR_KEY` to activate premium.",
         parse_mode="Markdown",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=_GET_PREMIUM_KEYBOARD,
     )
 
 
 async def generate_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
-        if str(update.effective_user.id) != ADMIN_ID:
+        if update.effective_user.id != ADMIN_USER_ID:
             log_security_event("unauthorized_key_generation", str(update.effective_user.id))
             await update.message.reply_text("❌ Admin only command.")
             return
@@ -928,15 +1184,7 @@ async def generate_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         key, expiry = generate_secure_key(duration)
 
-        # Save key
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
-                "INSERT INTO premium_data (value, expiry_date, is_key) VALUES (%s, %s, TRUE)",
-                (key, expiry)
-            )
-            conn.commit()
-        put_db_connection(conn)
+        await run_db(add_premium_key, key, expiry)
 
         log_security_event("key_generated", str(update.effective_user.id), f"Duration: {duration} days")
 
@@ -953,13 +1201,28 @@ async def generate_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"GenerateKey Error: {e}")
         await update.message.reply_text("❌ Failed to generate key. Please check logs.", parse_mode="Markdown")
 
+# /redeem replies
+_REDEEM_RATE_LIMIT_TEXT = "⏳ Too many attempts! Please try again in {} seconds."
+_REDEEM_USAGE_TEXT = "Usage: `/redeem YOUR_KEY`\n\nContact @ThantLwinMaung to get a premium key."
+_REDEEM_BAD_FORMAT_TEXT = "❌ *Invalid Key Format*\n\nThe key you entered is not in the correct format."
+_REDEEM_TAMPERED_TEXT = "❌ *Invalid Key*\n\nThis key appears to be tampered with."
+_REDEEM_EXPIRED_TEXT = "❌ *Expired Key*\n\nThis key has already expired."
+_REDEEM_NOT_FOUND_TEXT = "❌ *Invalid Key*\n\nThis key was not found in our system."
+_REDEEM_SUCCESS_TEXT = (
+    "🎉 *Premium Activated!*\n\n"
+    "Your premium access is valid until *{}*.\n\n"
+    "You now have access to all premium templates and features!"
+)
+_REDEEM_FAILED_TEXT = "❌ Failed to redeem key. Please try again."
+
+
 async def redeem_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
 
     if check_rate_limit(user_id):
         remaining_time = int(REDEEM_COOLDOWN - (time.time() - redeem_attempts[user_id]['last_attempt']))
         await update.message.reply_text(
-            f"⏳ Too many attempts! Please try again in {remaining_time} seconds.",
+            _REDEEM_RATE_LIMIT_TEXT.format(remaining_time),
             parse_mode="Markdown",
         )
         return
@@ -967,7 +1230,7 @@ async def redeem_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args or len(context.args) != 1:
         record_attempt(user_id, False)
         await update.message.reply_text(
-            "Usage: `/redeem YOUR_KEY`\n\nContact @ThantLwinMaung to get a premium key.",
+            _REDEEM_USAGE_TEXT,
             parse_mode="Markdown",
         )
         return
@@ -977,7 +1240,7 @@ async def redeem_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
         record_attempt(user_id, False)
         log_security_event("invalid_key_format", user_id, input_key)
         await update.message.reply_text(
-            "❌ *Invalid Key Format*\n\nThe key you entered is not in the correct format.",
+            _REDEEM_BAD_FORMAT_TEXT,
             parse_mode="Markdown",
         )
         return
@@ -986,78 +1249,49 @@ async def redeem_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
         record_attempt(user_id, False)
         log_security_event("invalid_key_signature", user_id, input_key)
         await update.message.reply_text(
-            "❌ *Invalid Key*\n\nThis key appears to be tampered with.",
+            _REDEEM_TAMPERED_TEXT,
             parse_mode="Markdown",
         )
         return
 
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT expiry_date FROM premium_data WHERE value = %s AND is_key = TRUE",
-                (input_key,)
-            )
-            row = cur.fetchone()
-
-            if not row:
-                record_attempt(user_id, False)
-                log_security_event("invalid_key_attempt", user_id, input_key)
+        # Save user as premium and delete the key atomically, so two
+        # concurrent redeems can't both spend the same key
+        expiry_date = await run_db(redeem_premium_key, user_id, input_key)
+        if expiry_date is None:
+            record_attempt(user_id, False)
+            # Only failed redeems pay for a second query, to tell the user why
+            if await run_db(get_key_expiry, input_key):
+                log_security_event("expired_key", user_id, input_key)
                 await update.message.reply_text(
-                    "❌ *Invalid Key*\n\nThis key was not found in our system.",
+                    _REDEEM_EXPIRED_TEXT,
                     parse_mode="Markdown",
                 )
-                return
-
-            expiry_date = row[0]
-            if expiry_date < datetime.now().date():
-                record_attempt(user_id, False)
-                log_security_event("expired_key", user_id, input_key)
+            else:
+                log_security_event("invalid_key_attempt", user_id, input_key)
                 await update.message.reply_text(
-                    "❌ *Expired Key*\n\nThis key has already expired.",
+                    _REDEEM_NOT_FOUND_TEXT,
                     parse_mode="Markdown",
                 )
-                return
-
-            # Save user as premium
-            cur.execute(
-                "INSERT INTO premium_data (value, expiry_date, is_key) VALUES (%s, %s, FALSE) "
-                "ON CONFLICT (value) DO UPDATE SET expiry_date = EXCLUDED.expiry_date",
-                (user_id, expiry_date)
-            )
-
-            # Delete the key
-            cur.execute(
-                "DELETE FROM premium_data WHERE value = %s AND is_key = TRUE",
-                (input_key,)
-            )
-
-            conn.commit()
-        put_db_connection(conn)
+            return
 
         record_attempt(user_id, True)
         log_security_event("key_redeemed", user_id, f"Expires: {expiry_date}")
 
         await update.message.reply_text(
-            f"🎉 *Premium Activated!*\n\n"
-            f"Your premium access is valid until *{expiry_date}*.\n\n"
-            f"You now have access to all premium templates and features!",
+            _REDEEM_SUCCESS_TEXT.format(expiry_date),
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("💎 Premium Features", callback_data="premium_features")],
-                [InlineKeyboardButton("✨ Create Resume", callback_data="new_resume")],
-            ]),
+            reply_markup=_REDEEM_SUCCESS_KB,
         )
 
     except Exception as e:
         logger.error(f"RedeemKey Error: {e}")
-        await update.message.reply_text("❌ Failed to redeem key. Please try again.", parse_mode="Markdown")
+        notify_admin(f"🚨 RedeemKey Error: {e}")
+        await update.message.reply_text(_REDEEM_FAILED_TEXT, parse_mode="Markdown")
 
         
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    if user_id in user_data:
-        del user_data[user_id]
+    context.user_data.pop("resume", None)
 
     await update.message.reply_text(
         "🚫 Operation cancelled. Your progress has been cleared.",
@@ -1073,14 +1307,11 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"User: {update.effective_user if update else 'No update object'}"
     )
     
-    # Print to console (visible in Render logs)
-    print(error_msg)
+    # Log to console (visible in Render logs)
+    logger.error(error_msg)
     
-    # Send error to admin
-    await context.bot.send_message(
-        chat_id=ADMIN_ID,
-        text=f"🚨 Bot Error:\n{error_msg}"
-    )
+    # Send error to admin without holding up the user's reply
+    notify_admin(f"🚨 Bot Error:\n{error_msg}")
     
     # Notify user
     if update and update.message:
@@ -1088,36 +1319,42 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif update and update.callback_query:
         await update.callback_query.answer("❌ Error occurred. Please try again.", show_alert=True)
 
-async def security_monitor(context: ContextTypes.DEFAULT_TYPE):
-    """Periodic security check"""
+async def security_monitor(application):
+    """Periodic security check (one pass; scheduled by run_repeating)"""
+    try:
+        # Check for brute force attempts
+        suspicious_users = [
+            user_id for user_id, record in redeem_attempts.items()
+            if record['attempts'] >= MAX_REDEEM_ATTEMPTS * 2
+        ]
+
+        if suspicious_users:
+            message = "🚨 *Security Alert* 🚨\n\n"
+            message += "Multiple failed redemption attempts detected:\n"
+            for user_id in suspicious_users:
+                attempts = redeem_attempts[user_id]['attempts']
+                message += f"- User {user_id}: {attempts} failed attempts\n"
+
+            await application.bot.send_message(
+                chat_id=ADMIN_ID,
+                text=message,
+                parse_mode="Markdown"
+            )
+
+    except Exception as e:
+        logger.error(f"Security monitor error: {e}")
+
+
+async def run_repeating(callback, application, interval, first=0):
+    """Await callback(application) every `interval` seconds after `first`.
+
+    Stands in for application.job_queue.run_repeating, which needs the
+    optional python-telegram-bot[job-queue] extra.
+    """
+    await asyncio.sleep(first)
     while True:
-        try:
-            # Check for brute force attempts
-            now = time.time()
-            suspicious_users = [
-                user_id for user_id, record in redeem_attempts.items()
-                if record['attempts'] >= MAX_REDEEM_ATTEMPTS * 2
-            ]
-            
-            if suspicious_users:
-                message = "🚨 *Security Alert* 🚨\n\n"
-                message += "Multiple failed redemption attempts detected:\n"
-                for user_id in suspicious_users:
-                    attempts = redeem_attempts[user_id]['attempts']
-                    message += f"- User {user_id}: {attempts} failed attempts\n"
-                
-                await context.bot.send_message(
-                    chat_id=ADMIN_ID,
-                    text=message,
-                    parse_mode="Markdown"
-                )
-                
-            # Sleep for 5 minutes between checks
-            await asyncio.sleep(300)
-            
-        except Exception as e:
-            print(f"Security monitor error: {e}")
-            await asyncio.sleep(60)
+        await callback(application)
+        await asyncio.sleep(interval)
 
 async def shutdown(application):
     """Shutdown the bot gracefully"""
@@ -1126,24 +1363,6 @@ async def shutdown(application):
     # Close all database connections
     connection_pool.closeall()
     
-def run_bot():
-    """Run the Telegram bot in the background"""
-    app = ApplicationBuilder().token(TOKEN).post_init(post_init).build()
-    setup_handlers(app)
-    
-    # Create an event loop for the thread
-    def polling_thread():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(app.run_polling())
-    
-    thread = Thread(target=polling_thread)
-    thread.daemon = True
-    thread.start()
-    
-    logger.info("✅ Telegram bot is running in background...")
-    return thread
-
 def setup_handlers(app):
     """Configure all handlers"""
     # Conversation handler first
@@ -1182,7 +1401,7 @@ def setup_handlers(app):
         CommandHandler(
             "dbcheck",
             db_check,
-            filters=filters.User(user_id=int(ADMIN_ID))
+            filters=filters.User(user_id=ADMIN_USER_ID)
         )
     )
 
@@ -1191,14 +1410,14 @@ def setup_handlers(app):
         CommandHandler(
             "state",
             check_state,
-            filters=filters.User(user_id=int(ADMIN_ID))
+            filters=filters.User(user_id=ADMIN_USER_ID)
         )
     )
     app.add_handler(
         CommandHandler(
             "generatekey",
             generate_key,
-            filters=filters.User(user_id=int(ADMIN_ID))
+            filters=filters.User(user_id=ADMIN_USER_ID)
         )
     )
 
@@ -1213,8 +1432,8 @@ def setup_handlers(app):
     app.add_error_handler(error_handler)
     
 async def main():
-    # Start web server
-    asyncio.create_task(run_webserver())
+    # Start web server on this loop; awaiting it surfaces bind errors
+    runner = await run_webserver()
     
     # Start Telegram bot
     app = ApplicationBuilder().token(TOKEN).post_init(post_init).build()
@@ -1222,14 +1441,22 @@ async def main():
     
     logger.info("✅ Starting services...")
     await app.initialize()
+    # post_init only runs by itself under run_polling()/run_webhook()
+    await post_init(app)
     await app.start()
     
     if app.updater:
         await app.updater.start_polling()
     
     # Keep running
-    while True:
-        await asyncio.sleep(3600)
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        if app.updater:
+            await app.updater.stop()
+        await shutdown(app)
+        await runner.cleanup()
 
 if __name__ == "__main__":
     try:
@@ -1248,8 +1475,11 @@ if __name__ == "__main__":
         else:
             logger.warning("Signal handlers are not supported on Windows. Skipping...")
 
-        loop.run_forever()
+        # main_task finishing (or being cancelled) ends the loop
+        loop.run_until_complete(main_task)
 
+    except asyncio.CancelledError:
+        logger.info("Shutdown signal received")
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
     except Exception as e: